@@ -6,6 +6,7 @@ load_dotenv()
 import streamlit as st
 import google.generativeai as genai
 from knowledge_base import ClimateKnowledgeBase, CLIMATE_SOURCES
+from semantic_cache import SemanticCache
 
 # Configure the Gemini API
 API_KEY = os.getenv("GEMINI_API_KEY")
@@ -21,6 +22,10 @@ st.set_page_config(
 if "knowledge_base" not in st.session_state:
     st.session_state.knowledge_base = ClimateKnowledgeBase()
 
+# Cache of recent answers, so repeated questions skip retrieval and Gemini
+if "response_cache" not in st.session_state:
+    st.session_state.response_cache = SemanticCache()
+
 if "messages" not in st.session_state:
     st.session_state.messages = [
         {
@@ -94,6 +99,7 @@ def display_knowledge_base_sidebar():
             with st.spinner(f"Processing {uploaded_file.name}..."):
                 documents = st.session_state.knowledge_base.load_pdf(file_path, uploaded_file.name)
                 if documents:
+                    st.session_state.response_cache.clear()
                     st.success(f"✅ Loaded {len(documents)} chunks from {uploaded_file.name}")
                     st.rerun()
         
@@ -111,9 +117,18 @@ def display_knowledge_base_sidebar():
                 url = CLIMATE_SOURCES[selected_source]
                 documents = st.session_state.knowledge_base.load_web_article(url, selected_source)
                 if documents:
+                    st.session_state.response_cache.clear()
                     st.success(f"✅ Loaded {len(documents)} chunks from {selected_source}")
                     st.rerun()
         
+        if st.button("📥 Load All Sources"):
+            with st.spinner(f"Loading {len(CLIMATE_SOURCES)} climate sources..."):
+                documents = st.session_state.knowledge_base.load_web_articles_bulk(CLIMATE_SOURCES)
+                if documents:
+                    st.session_state.response_cache.clear()
+                    st.success(f"✅ Loaded {len(documents)} chunks from all sources")
+                    st.rerun()
+        
         # Custom URL input
         st.markdown("#### Add Custom Article:")
         custom_url = st.text_input("Enter article URL")
@@ -126,12 +141,14 @@ def display_knowledge_base_sidebar():
                     custom_name if custom_name else None
                 )
                 if documents:
+                    st.session_state.response_cache.clear()
                     st.success(f"✅ Loaded {len(documents)} chunks")
                     st.rerun()
         
         # Clear knowledge base
         if st.button("🗑️ Clear Knowledge Base"):
             st.session_state.knowledge_base = ClimateKnowledgeBase()
+            st.session_state.response_cache.clear()
             st.success("Knowledge base cleared!")
             st.rerun()
 
@@ -179,28 +196,45 @@ with col1:
         with st.chat_message("assistant"):
             placeholder = st.empty()
             
-            # Search for relevant documents
-            with st.spinner("Searching knowledge base..."):
-                relevant_docs = st.session_state.knowledge_base.search_documents(prompt, max_results=3)
+            # Embed the question once; the answer cache and the document search share it
+            query_embedding = st.session_state.knowledge_base.embed_query(prompt)
             
-            if relevant_docs:
-                placeholder.write("🔍 Found relevant documents, generating response...")
-            else:
-                placeholder.write("🤔 Thinking... (no specific documents found, using general knowledge)")
+            # Reuse the answer to an earlier question that means the same thing
+            cached = None
+            if query_embedding is not None:
+                cached = st.session_state.response_cache.lookup(query_embedding)
             
-            try:
-                # Create enhanced prompt with document context
-                enhanced_prompt, sources_used = create_knowledge_enhanced_prompt(prompt, relevant_docs)
-                
-                # Generate response with Gemini
-                model = genai.GenerativeModel('gemini-1.5-flash')
-                response = model.generate_content(enhanced_prompt)
+            if cached is not None:
+                friendly_answer, relevant_docs = cached
+            else:
+                # Search for relevant documents
+                with st.spinner("Searching knowledge base..."):
+                    relevant_docs = st.session_state.knowledge_base.search_documents(
+                        prompt, max_results=3, query_embedding=query_embedding
+                    )
                 
-                answer = response.text
-                friendly_answer = friendly_wrap_with_sources(answer, sources_used)
+                if relevant_docs:
+                    placeholder.write("🔍 Found relevant documents, generating response...")
+                else:
+                    placeholder.write("🤔 Thinking... (no specific documents found, using general knowledge)")
                 
-            except Exception as e:
-                friendly_answer = f"I'm sorry, I encountered an error: {e}. Please try asking your question again."
+                try:
+                    # Create enhanced prompt with document context
+                    enhanced_prompt, sources_used = create_knowledge_enhanced_prompt(prompt, relevant_docs)
+                    
+                    # Generate response with Gemini, showing tokens as they arrive
+                    model = genai.GenerativeModel('gemini-1.5-flash')
+                    response = model.generate_content(enhanced_prompt, stream=True)
+                    
+                    with placeholder.container():
+                        answer = st.write_stream(chunk.text for chunk in response)
+                    friendly_answer = friendly_wrap_with_sources(answer, sources_used)
+                    
+                    if query_embedding is not None:
+                        st.session_state.response_cache.add(query_embedding, friendly_answer, relevant_docs)
+                    
+                except Exception as e:
+                    friendly_answer = f"I'm sorry, I encountered an error: {e}. Please try asking your question again."
             
             # Replace placeholder with actual response
             placeholder.write(friendly_answer)
@@ -212,7 +246,7 @@ with col1:
             if relevant_docs:
                 with st.expander(f"📄 View {len(relevant_docs)} relevant document excerpts"):
                     for i, doc in enumerate(relevant_docs, 1):
-                        st.markdown(f"**Source {i}: {doc['source']}** (Score: {doc['relevance_score']})")
+                        st.markdown(f"**Source {i}: {doc['source']}** (Score: {doc['relevance_score']:.3f})")
                         st.markdown(f"```\n{doc['content'][:300]}...\n```")
                         st.markdown("---")
 
@@ -0,0 +1,77 @@
+# document_store.py
+import mmap
+import os
+import tempfile
+import weakref
+from pathlib import Path
+from typing import Dict, Iterator, List
+import numpy as np
+import orjson
+
+def _close_store(handles: Dict, path: str):
+    """Release a store's file handles and delete its backing file"""
+    if handles["mmap"] is not None:
+        handles["mmap"].close()
+    handles["file"].close()
+    os.remove(path)
+
+class DocumentStore:
+    """Append-only list of chunk dicts kept on disk as memory-mapped JSON lines"""
+
+    def __init__(self, directory: Path):
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, path = tempfile.mkstemp(suffix=".jsonl", dir=directory)
+        # File handles live in a dict the finalizer can close without keeping the store alive
+        self._handles = {"file": os.fdopen(fd, "w+b"), "mmap": None}
+        self._spans = np.empty((1024, 2), dtype=np.int64)  # (byte offset, length) per document
+        self._count = 0
+        self._size = 0
+        # The backing file only lives as long as this store
+        weakref.finalize(self, _close_store, self._handles, path)
+
+    def extend(self, documents: List[Dict]):
+        """Append documents to the end of the store"""
+        lines = [orjson.dumps(doc) + b"\n" for doc in documents]
+
+        needed = self._count + len(lines)
+        if needed > len(self._spans):
+            grown = np.empty((max(needed, 2 * len(self._spans)), 2), dtype=np.int64)
+            grown[:self._count] = self._spans[:self._count]
+            self._spans = grown
+
+        offset = self._size
+        for i, line in enumerate(lines, start=self._count):
+            self._spans[i] = (offset, len(line) - 1)
+            offset += len(line)
+
+        file = self._handles["file"]
+        file.seek(self._size)
+        file.write(b"".join(lines))
+        file.flush()
+        self._count = needed
+        self._size = offset
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, idx: int) -> Dict:
+        """Decode a single document; callers get a fresh dict they are free to modify"""
+        if idx < 0:
+            idx += self._count
+        if not 0 <= idx < self._count:
+            raise IndexError("document index out of range")
+
+        # Re-map after appends so the mapping covers the whole file
+        view = self._handles["mmap"]
+        if view is None or len(view) < self._size:
+            if view is not None:
+                view.close()
+            view = mmap.mmap(self._handles["file"].fileno(), 0, access=mmap.ACCESS_READ)
+            self._handles["mmap"] = view
+
+        offset, length = self._spans[idx]
+        return orjson.loads(view[offset:offset + length])
+
+    def __iter__(self) -> Iterator[Dict]:
+        for idx in range(self._count):
+            yield self[idx]
@@ -1,16 +1,102 @@
 # knowledge_base.py
 import os
+import re
+import json
+import itertools
+import time
+from pathlib import Path
 import requests
-from pypdf import PdfReader
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+import bm25s
+from bm25s.tokenization import Tokenized
+import numpy as np
+import hnswlib
+import pymupdf
+from lxml import etree
 from langchain_text_splitters import RecursiveCharacterTextSplitter
+from sentence_transformers import SentenceTransformer
 import streamlit as st
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from collections import defaultdict
 import hashlib
+from document_store import DocumentStore
+
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+EMBEDDING_ONNX_FILE = "onnx/model_quint8_avx2.onnx"  # int8-quantized export shipped with the model
+WEB_CACHE_TTL = 24 * 60 * 60  # Re-fetch cached web articles after a day
+LSH_BITS = 16  # Random hyperplanes per locality-sensitive hash signature
+LSH_MIN_CHUNKS = 2000  # Below this a full scan is cheap enough
+HNSW_MIN_CHUNKS = 5000  # From here on the HNSW graph replaces the LSH prefilter
+RRF_K = 60  # Reciprocal rank fusion damping constant
+MIN_SEMANTIC_SCORE = 0.3  # Cosine similarity below which a chunk is treated as unrelated
+SCAN_TILE_ROWS = 4096  # Embedding rows dequantized at a time during a full scan
+SIMHASH_MAX_DISTANCE = 3  # Chunks whose SimHashes differ in at most this many bits are duplicates
+_WORD_RE = re.compile(r"\w+")
+_META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?([\w.:-]+)""", re.IGNORECASE)
+_BLOCK_TAGS = (
+    'p', 'div', 'br', 'li', 'ul', 'ol', 'dt', 'dd', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'tr', 'td', 'th', 'table', 'section', 'article', 'main', 'blockquote', 'pre', 'figcaption',
+)
+
+@st.cache_resource(show_spinner=False)
+def get_embedding_model() -> SentenceTransformer:
+    """Load the sentence embedding model once per server process"""
+    try:
+        # The quantized ONNX model runs several times faster on CPU than FP32 PyTorch
+        return SentenceTransformer(
+            EMBEDDING_MODEL, backend="onnx", model_kwargs={"file_name": EMBEDDING_ONNX_FILE}
+        )
+    except (ImportError, OSError, ValueError) as e:
+        # ONNX Runtime missing, or the quantized export could not be fetched or loaded
+        st.warning(f"Quantized ONNX embedding model unavailable, using the slower FP32 model: {e}")
+        return SentenceTransformer(EMBEDDING_MODEL)
+
+def _simhash(text: str) -> int:
+    """64-bit SimHash of a text's word 3-gram shingles"""
+    words = _WORD_RE.findall(text.lower())
+    shingles = [" ".join(words[i:i + 3]) for i in range(max(len(words) - 2, 1))]
+    hashes = np.array(
+        [int.from_bytes(hashlib.md5(shingle.encode()).digest()[:8], "little") for shingle in shingles],
+        dtype=np.uint64,
+    )
+    # Each bit of the fingerprint is a majority vote of that bit across all shingle hashes
+    bits = np.unpackbits(hashes.view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    majority = bits.sum(axis=0) * 2 > len(shingles)
+    return int(np.packbits(majority, bitorder="little").view(np.uint64)[0])
 
 class ClimateKnowledgeBase:
     def __init__(self):
-        self.documents = []
+        self._cache_dir = Path(".kb_cache")
+        self.documents = DocumentStore(self._cache_dir / "stores")
+        self._sources = set()
+        self._types = set()
+        # One pooled session so repeated and concurrent fetches reuse connections.
+        # Responses are deliberately not HTTP-cached: that would buffer every body
+        # before streaming parsing starts, and the chunk cache already covers repeats
+        self._session = requests.Session()
+        self._session.headers['User-Agent'] = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        self._session.mount("https://", HTTPAdapter(pool_maxsize=8))
+        self._session.mount("http://", HTTPAdapter(pool_maxsize=8))
+        self._bm25 = bm25s.BM25()
+        self._corpus_tokens: List[np.ndarray] = []  # int32 token ids per chunk
+        self._vocab: Dict[str, int] = {}  # token -> id, shared across all chunks
+        self._chunk_refs = []
+        self._index_stale = False
+        self._simhashes = np.empty(1024, dtype=np.uint64)
+        self._simhash_count = 0
+        self._emb_matrix: Optional[np.ndarray] = None  # int8, one row per chunk
+        self._emb_scales: Optional[np.ndarray] = None  # float32 dequantization scale per row
+        self._emb_dim = 384
+        self._emb_count = 0
+        self._hnsw: Optional[hnswlib.Index] = None  # built once the corpus reaches HNSW_MIN_CHUNKS
+        self._lsh_planes = np.random.default_rng(0).standard_normal((LSH_BITS, self._emb_dim)).astype(np.float32)
+        self._lsh_buckets: Dict[int, List[int]] = defaultdict(list)  # only kept until the HNSW graph exists
+        try:
+            self._embedder = get_embedding_model()
+        except Exception as e:
+            st.warning(f"Semantic search unavailable, falling back to keyword search: {e}")
+            self._embedder = None
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=1000,
             chunk_overlap=200,
@@ -23,15 +109,20 @@ class ClimateKnowledgeBase:
             if source_name is None:
                 source_name = os.path.basename(file_path)
             
-            # Read PDF
-            reader = PdfReader(file_path)
-            full_text = ""
-            
-            for page in reader.pages:
-                full_text += page.extract_text() + "\n"
+            # Identical files (re-uploads, new sessions) reuse the cached chunks
+            sha = hashlib.sha256()
+            with open(file_path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    sha.update(block)
+            cache_key = f"pdf_{sha.hexdigest()}"
+            cached = self._read_cache(cache_key)
             
-            # Split into chunks
-            chunks = self.text_splitter.split_text(full_text)
+            if cached is not None:
+                chunks, page_count = cached["chunks"], cached["page_count"]
+            else:
+                with pymupdf.open(file_path) as pdf:
+                    chunks, page_count = self._split_pdf(pdf)
+                self._write_cache(cache_key, {"chunks": chunks, "page_count": page_count})
             
             # Create document objects
             documents = []
@@ -41,104 +132,380 @@ class ClimateKnowledgeBase:
                     "source": source_name,
                     "source_type": "PDF",
                     "chunk_id": f"{source_name}_chunk_{i}",
-                    "page_count": len(reader.pages)
+                    "page_count": page_count
                 }
                 documents.append(doc)
             
-            self.documents.extend(documents)
-            return documents
+            return self._add_documents(documents)
             
         except Exception as e:
             st.error(f"Error loading PDF {file_path}: {e}")
             return []
     
+    def _split_pdf(self, pdf: pymupdf.Document) -> Tuple[List[str], int]:
+        """Split an open PDF into chunks, returning (chunks, page count)"""
+        # Split one page at a time, so only a single page of text is held in memory at once
+        chunks = []
+        for page in pdf:
+            chunks.extend(self.text_splitter.split_text(page.get_text("text")))
+        return chunks, pdf.page_count
+    
     def load_web_article(self, url: str, source_name: str = None) -> List[Dict]:
         """Load and process a web article"""
         try:
-            if source_name is None:
-                source_name = url.split("//")[1].split("/")[0]  # Extract domain
-            
-            # Fetch webpage
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            
-            # Parse HTML
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Remove unwanted elements
-            for element in soup(['script', 'style', 'nav', 'header', 'footer', 'aside']):
-                element.decompose()
-            
-            # Extract text content
-            text = soup.get_text()
-            
-            # Clean up text
-            lines = [line.strip() for line in text.splitlines()]
-            text = ' '.join([line for line in lines if line])
-            
-            # Split into chunks
-            chunks = self.text_splitter.split_text(text)
-            
-            # Create document objects
-            documents = []
-            for i, chunk in enumerate(chunks):
-                doc = {
-                    "content": chunk,
-                    "source": source_name,
-                    "source_type": "Web Article",
-                    "url": url,
-                    "chunk_id": f"{source_name}_chunk_{i}"
-                }
-                documents.append(doc)
-            
-            self.documents.extend(documents)
-            return documents
+            chunks = self._fetch_web_chunks(url)
+            return self._add_documents(self._web_documents(url, source_name, chunks))
             
         except Exception as e:
             st.error(f"Error loading web article {url}: {e}")
             return []
     
-    def search_documents(self, query: str, max_results: int = 3) -> List[Dict]:
-        """Simple keyword search through documents"""
-        query_lower = query.lower()
-        scored_docs = []
+    def load_web_articles_bulk(self, urls: Dict[str, str]) -> List[Dict]:
+        """Load several web articles concurrently, given a {source name: url} mapping"""
+        # Downloads and parsing run on worker threads; indexing and error
+        # reporting stay on the Streamlit script thread
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = {
+                source_name: executor.submit(self._fetch_web_chunks, url)
+                for source_name, url in urls.items()
+            }
         
-        for doc in self.documents:
-            content_lower = doc["content"].lower()
-            
-            # Simple scoring based on keyword matches
-            score = 0
-            query_words = query_lower.split()
+        documents = []
+        for source_name, future in futures.items():
+            url = urls[source_name]
+            try:
+                chunks = future.result()
+                documents.extend(self._add_documents(self._web_documents(url, source_name, chunks)))
+            except Exception as e:
+                st.error(f"Error loading web article {url}: {e}")
+        return documents
+    
+    def _fetch_web_chunks(self, url: str) -> List[str]:
+        """Fetch a web page and split its text into chunks, reusing the disk cache when fresh"""
+        cache_key = f"web_{hashlib.sha256(url.encode()).hexdigest()}"
+        cached = self._read_cache(cache_key, max_age=WEB_CACHE_TTL)
+        if cached is not None:
+            return cached["chunks"]
+        
+        with self._session.get(url, timeout=10, stream=True) as response:
+            response.raise_for_status()
             
-            for word in query_words:
-                if len(word) > 3:  # Only count longer words
-                    score += content_lower.count(word)
+            # Linked PDFs (e.g. IPCC reports) go through PyMuPDF, not the HTML parser
+            content_type = response.headers.get("Content-Type", "")
+            if "application/pdf" in content_type or url.lower().split("?")[0].endswith(".pdf"):
+                with pymupdf.open(stream=response.content, filetype="pdf") as pdf:
+                    chunks, _ = self._split_pdf(pdf)
+                self._write_cache(cache_key, {"chunks": chunks})
+                return chunks
             
-            if score > 0:
-                doc_copy = doc.copy()
-                doc_copy["relevance_score"] = score
-                scored_docs.append(doc_copy)
+            # Parse HTML as it downloads, so parsing overlaps the network
+            # transfer and the raw page is never buffered in full.
+            # Use the header charset, else the page's <meta> charset, else UTF-8
+            # (left to itself lxml falls back to Latin-1 and garbles accents)
+            blocks = response.iter_content(chunk_size=65536)
+            first = next(blocks, b"")
+            encoding = response.encoding if "charset" in content_type else None
+            if encoding is None:
+                meta = _META_CHARSET_RE.search(first)
+                encoding = meta.group(1).decode("ascii") if meta else "utf-8"
+            parser = etree.HTMLPullParser(encoding=encoding)
+            for block in itertools.chain([first], blocks):
+                parser.feed(block)
+                for _ in parser.read_events():
+                    pass
+            root = parser.close()
+        
+        # Remove unwanted elements
+        etree.strip_elements(
+            root, etree.Comment, 'script', 'style', 'nav', 'header', 'footer', 'aside',
+            with_tail=False
+        )
+        
+        # Extract text content and collapse whitespace. Only block-level
+        # elements break words, so inline markup like CO<sub>2</sub> stays whole
+        body = root.find('body')
+        body = body if body is not None else root
+        for element in body.iter(*_BLOCK_TAGS):
+            element.text = ' ' + (element.text or '')
+            element.tail = ' ' + (element.tail or '')
+        text = ' '.join(''.join(body.itertext()).split())
+        
+        # Split into chunks
+        chunks = self.text_splitter.split_text(text)
+        self._write_cache(cache_key, {"chunks": chunks})
+        return chunks
+    
+    def _web_documents(self, url: str, source_name: Optional[str], chunks: List[str]) -> List[Dict]:
+        """Create document objects for a web article's chunks"""
+        if source_name is None:
+            source_name = url.split("//")[1].split("/")[0]  # Extract domain
+        
+        documents = []
+        for i, chunk in enumerate(chunks):
+            doc = {
+                "content": chunk,
+                "source": source_name,
+                "source_type": "Web Article",
+                "url": url,
+                "chunk_id": f"{source_name}_chunk_{i}"
+            }
+            documents.append(doc)
+        return documents
+    
+    def _read_cache(self, key: str, max_age: float = None) -> Optional[Dict]:
+        """Return a cached extraction, or None if it is missing or older than max_age seconds"""
+        path = self._cache_dir / f"{key}.json"
+        if not path.exists():
+            return None
+        if max_age is not None and time.time() - path.stat().st_mtime > max_age:
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    
+    def _write_cache(self, key: str, value: Dict):
+        """Store an extraction on disk, writing atomically so readers never see a partial file"""
+        self._cache_dir.mkdir(exist_ok=True)
+        path = self._cache_dir / f"{key}.json"
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(value, f)
+        os.replace(tmp_path, path)
+    
+    def _add_documents(self, documents: List[Dict]) -> List[Dict]:
+        """Append new chunks to the knowledge base, index them, and return the ones kept"""
+        # Do all the work that can fail before touching any state, so a failed
+        # load never leaves the store and the indexes out of step
+        documents, fingerprints = self._drop_near_duplicates(documents)
+        texts = [doc["content"] for doc in documents]
+        tokenized = bm25s.tokenize(texts, return_ids=False, stopwords="en", show_progress=False)
+        new_embs = None
+        if self._embedder is not None and texts:
+            new_embs = self._embedder.encode(
+                texts, batch_size=64, normalize_embeddings=True, convert_to_numpy=True
+            ).astype(np.float32, copy=False)
+        
+        self._commit_fingerprints(fingerprints)
+        # Keep tokens as compact id arrays rather than lists of Python strings
+        for tokens in tokenized:
+            self._corpus_tokens.append(
+                np.array([self._vocab.setdefault(token, len(self._vocab)) for token in tokens], dtype=np.int32)
+            )
+        self._chunk_refs.extend(range(len(self.documents), len(self.documents) + len(documents)))
+        self.documents.extend(documents)
+        self._sources.update(doc["source"] for doc in documents)
+        self._types.update(doc["source_type"] for doc in documents)
+        self._index_stale = True
+        
+        if new_embs is not None:
+            self._add_embeddings(new_embs)
+        return documents
+    
+    def _drop_near_duplicates(self, documents: List[Dict]) -> Tuple[List[Dict], np.ndarray]:
+        """Split off chunks whose SimHash is within SIMHASH_MAX_DISTANCE bits of a loaded or earlier chunk.
+        
+        Returns the kept chunks and their fingerprints; nothing is recorded until _commit_fingerprints.
+        """
+        kept = []
+        fingerprints = np.empty(len(documents), dtype=np.uint64)
+        existing = self._simhashes[:self._simhash_count]
+        for doc in documents:
+            fingerprint = np.uint64(_simhash(doc["content"]))
+            if self._simhash_count and np.bitwise_count(existing ^ fingerprint).min() <= SIMHASH_MAX_DISTANCE:
+                continue
+            batch = fingerprints[:len(kept)]
+            if len(kept) and np.bitwise_count(batch ^ fingerprint).min() <= SIMHASH_MAX_DISTANCE:
+                continue
+            fingerprints[len(kept)] = fingerprint
+            kept.append(doc)
         
-        # Sort by relevance and return top results
-        scored_docs.sort(key=lambda x: x["relevance_score"], reverse=True)
-        return scored_docs[:max_results]
+        if documents and not kept:
+            st.info(f"No new content — every chunk from {documents[0]['source']} duplicates content already in the knowledge base")
+        return kept, fingerprints[:len(kept)]
+    
+    def _commit_fingerprints(self, fingerprints: np.ndarray):
+        """Record the SimHashes of chunks that are being added"""
+        needed = self._simhash_count + len(fingerprints)
+        if needed > len(self._simhashes):
+            grown = np.empty(max(needed, 2 * len(self._simhashes)), dtype=np.uint64)
+            grown[:self._simhash_count] = self._simhashes[:self._simhash_count]
+            self._simhashes = grown
+        self._simhashes[self._simhash_count:needed] = fingerprints
+        self._simhash_count = needed
+    
+    def _add_embeddings(self, new_embs: np.ndarray):
+        """Append normalized chunk embeddings to the embedding matrix"""
+        # Store embeddings as int8 with a per-row scale, a quarter of the FP32 footprint
+        scales = np.abs(new_embs).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        quantized = np.round(new_embs / scales[:, None]).astype(np.int8)
+        
+        # Grow the matrix by doubling so repeated ingests don't copy it every time
+        needed = self._emb_count + len(new_embs)
+        if self._emb_matrix is None or needed > len(self._emb_matrix):
+            capacity = max(needed, 1024 if self._emb_matrix is None else 2 * len(self._emb_matrix))
+            grown = np.empty((capacity, self._emb_dim), dtype=np.int8)
+            grown_scales = np.empty(capacity, dtype=np.float32)
+            if self._emb_matrix is not None:
+                grown[:self._emb_count] = self._emb_matrix[:self._emb_count]
+                grown_scales[:self._emb_count] = self._emb_scales[:self._emb_count]
+            self._emb_matrix = grown
+            self._emb_scales = grown_scales
+        
+        self._emb_matrix[self._emb_count:needed] = quantized
+        self._emb_scales[self._emb_count:needed] = scales
+        if self._hnsw is not None:
+            if needed > self._hnsw.get_max_elements():
+                self._hnsw.resize_index(2 * needed)
+            self._hnsw.add_items(new_embs, np.arange(self._emb_count, needed))
+        else:
+            for i, sig in enumerate(self._lsh_signatures(new_embs), start=self._emb_count):
+                self._lsh_buckets[int(sig)].append(i)
+        self._emb_count = needed
+        
+        if self._hnsw is None and self._emb_count >= HNSW_MIN_CHUNKS:
+            self._build_hnsw()
+    
+    def _build_hnsw(self):
+        """Build the HNSW index from the int8 embedding matrix, one dequantized tile at a time"""
+        self._hnsw = hnswlib.Index(space="cosine", dim=self._emb_dim)
+        self._hnsw.init_index(max_elements=2 * self._emb_count, M=16, ef_construction=200)
+        self._hnsw.set_ef(50)
+        for start in range(0, self._emb_count, SCAN_TILE_ROWS):
+            stop = min(start + SCAN_TILE_ROWS, self._emb_count)
+            tile = self._emb_matrix[start:stop].astype(np.float32) * self._emb_scales[start:stop, None]
+            self._hnsw.add_items(tile, np.arange(start, stop))
+        # The graph supersedes the LSH buckets
+        self._lsh_buckets.clear()
+    
+    def _lsh_signatures(self, embs: np.ndarray) -> np.ndarray:
+        """Hash embeddings to LSH_BITS-bit signatures, one bit per side of each random hyperplane"""
+        bits = (embs @ self._lsh_planes.T > 0).astype(np.uint32)
+        return bits @ (np.uint32(1) << np.arange(LSH_BITS, dtype=np.uint32))
+    
+    def _lsh_candidates(self, q: np.ndarray) -> List[int]:
+        """Chunks whose signature is within Hamming distance 1 of the query's"""
+        qsig = int(self._lsh_signatures(q[None])[0])
+        candidates = list(self._lsh_buckets.get(qsig, []))
+        for bit in range(LSH_BITS):
+            candidates.extend(self._lsh_buckets.get(qsig ^ (1 << bit), []))
+        return candidates
+    
+    def _ensure_index(self):
+        """(Re)build the BM25 index if new chunks were added since the last search"""
+        if self._index_stale:
+            corpus = Tokenized(ids=[ids.tolist() for ids in self._corpus_tokens], vocab=self._vocab)
+            self._bm25.index(corpus, show_progress=False)
+            self._index_stale = False
+    
+    def _keyword_search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """BM25 keyword search, returning (document index, score) pairs"""
+        query_tokens = bm25s.tokenize([query], return_ids=False, stopwords="en", show_progress=False)
+        if not query_tokens[0]:
+            return []
+        
+        self._ensure_index()
+        k = min(k, len(self._chunk_refs))
+        results, scores = self._bm25.retrieve(query_tokens, k=k, show_progress=False)
+        return [
+            (self._chunk_refs[idx], float(score))
+            for idx, score in zip(results[0], scores[0])
+            if score > 0
+        ]
+    
+    def embed_query(self, query: str) -> Optional[np.ndarray]:
+        """Embed a query as a normalized vector, or None if semantic search is unavailable"""
+        if self._embedder is None:
+            return None
+        return self._embedder.encode(query, normalize_embeddings=True, convert_to_numpy=True).astype(np.float32)
+    
+    def _semantic_search(self, query: str, k: int, query_embedding: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        """Cosine-similarity search, returning (document index, score) pairs above MIN_SEMANTIC_SCORE"""
+        # Embedding rows double as document indices, so they must stay in step
+        assert self._emb_count == len(self.documents), "embedding matrix out of sync with documents"
+        q = query_embedding if query_embedding is not None else self.embed_query(query)
+        
+        k = min(k, self._emb_count)
+        
+        # Large corpora go through the approximate HNSW graph instead of a full scan
+        if self._hnsw is not None:
+            labels, distances = self._hnsw.knn_query(q, k=k)
+            return [
+                (int(idx), 1.0 - float(dist))
+                for idx, dist in zip(labels[0], distances[0])
+                if 1.0 - dist >= MIN_SEMANTIC_SCORE
+            ]
+        
+        # Mid-sized corpora only score chunks that hash near the query,
+        # falling back to a full scan if that shortlist is too small
+        if self._emb_count >= LSH_MIN_CHUNKS:
+            candidates = np.array(self._lsh_candidates(q), dtype=np.int64)
+            if len(candidates) >= k:
+                scores = (self._emb_matrix[candidates].astype(np.float32) @ q) * self._emb_scales[candidates]
+                top = np.argpartition(-scores, k - 1)[:k]
+                top = top[np.argsort(-scores[top])]
+                return [
+                    (int(candidates[i]), float(scores[i]))
+                    for i in top
+                    if scores[i] >= MIN_SEMANTIC_SCORE
+                ]
+        
+        # Score every chunk with matrix-vector products, dequantizing one tile
+        # of the int8 matrix at a time so the temporary FP32 copy stays small
+        scores = np.empty(self._emb_count, dtype=np.float32)
+        for start in range(0, self._emb_count, SCAN_TILE_ROWS):
+            stop = min(start + SCAN_TILE_ROWS, self._emb_count)
+            tile = self._emb_matrix[start:stop].astype(np.float32)
+            scores[start:stop] = (tile @ q) * self._emb_scales[start:stop]
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(idx), float(scores[idx])) for idx in top if scores[idx] >= MIN_SEMANTIC_SCORE]
+    
+    def search_documents(self, query: str, max_results: int = 3,
+                         query_embedding: Optional[np.ndarray] = None) -> List[Dict]:
+        """Hybrid keyword + semantic search through documents, fused by reciprocal rank"""
+        if not self.documents:
+            return []
+        
+        if self._embedder is None:
+            hits = self._keyword_search(query, max_results)
+        else:
+            # Both searches spend their time in NumPy/SciPy code that releases the GIL,
+            # so running them side by side costs about as much as the slower one
+            candidates = 4 * max_results
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                keyword = executor.submit(self._keyword_search, query, candidates)
+                semantic = executor.submit(self._semantic_search, query, candidates, query_embedding)
+                hits = self._fuse_rankings([keyword.result(), semantic.result()])[:max_results]
+        
+        scored_docs = []
+        for idx, score in hits:
+            doc = self.documents[idx]  # decoded fresh from the store, safe to annotate
+            doc["relevance_score"] = score
+            scored_docs.append(doc)
+        
+        # Hits come back sorted by relevance
+        return scored_docs
+    
+    @staticmethod
+    def _fuse_rankings(rankings: List[List[Tuple[int, float]]]) -> List[Tuple[int, float]]:
+        """Reciprocal rank fusion: each list contributes 1 / (RRF_K + rank) per document"""
+        fused = {}
+        for ranking in rankings:
+            for rank, (idx, _) in enumerate(ranking, start=1):
+                fused[idx] = fused.get(idx, 0.0) + 1.0 / (RRF_K + rank)
+        return sorted(fused.items(), key=lambda item: item[1], reverse=True)
     
     def get_document_stats(self) -> Dict:
         """Get statistics about loaded documents"""
         if not self.documents:
             return {"total_chunks": 0, "sources": 0, "types": []}
         
-        sources = set(doc["source"] for doc in self.documents)
-        types = set(doc["source_type"] for doc in self.documents)
-        
+        # Sources and types are tracked at ingest, so reruns never rescan every chunk
         return {
             "total_chunks": len(self.documents),
-            "sources": len(sources),
-            "source_list": list(sources),
-            "types": list(types)
+            "sources": len(self._sources),
+            "source_list": list(self._sources),
+            "types": list(self._types)
         }
 
 # Predefined climate knowledge sources
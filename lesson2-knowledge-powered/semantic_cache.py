@@ -0,0 +1,46 @@
+# semantic_cache.py
+from collections import OrderedDict
+from typing import List, Dict, Optional, Tuple
+import faiss
+import numpy as np
+
+class SemanticCache:
+    """Reuse answers for questions that mean the same thing as an earlier one"""
+
+    def __init__(self, dim: int = 384, threshold: float = 0.85, max_entries: int = 500):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        # Inner product over normalized embeddings is cosine similarity
+        self._index = faiss.IndexIDMap(faiss.IndexFlatIP(dim))
+        self._entries = OrderedDict()  # entry id -> (answer, relevant docs), least recently used first
+        self._next_id = 0
+
+    def lookup(self, query_embedding: np.ndarray) -> Optional[Tuple[str, List[Dict]]]:
+        """Return the cached (answer, relevant docs) for a similar enough question, if any"""
+        if not self._entries:
+            return None
+
+        query = np.ascontiguousarray(query_embedding, dtype=np.float32)[None]
+        scores, ids = self._index.search(query, 1)
+        if scores[0, 0] < self.threshold:
+            return None
+
+        entry_id = int(ids[0, 0])
+        self._entries.move_to_end(entry_id)
+        return self._entries[entry_id]
+
+    def add(self, query_embedding: np.ndarray, answer: str, relevant_docs: List[Dict]):
+        """Cache an answer, evicting the least recently used entry when full"""
+        if len(self._entries) >= self.max_entries:
+            oldest_id, _ = self._entries.popitem(last=False)
+            self._index.remove_ids(np.array([oldest_id], dtype=np.int64))
+
+        query = np.ascontiguousarray(query_embedding, dtype=np.float32)[None]
+        self._index.add_with_ids(query, np.array([self._next_id], dtype=np.int64))
+        self._entries[self._next_id] = (answer, relevant_docs)
+        self._next_id += 1
+
+    def clear(self):
+        """Drop every cached answer, e.g. after the knowledge base changes"""
+        self._index.reset()
+        self._entries.clear()